@@ -4,23 +4,31 @@
 """
 import os
 
-import numpy as np
+from pyramids.datacube import Datacube
 
-rpath = r"C:\MyComputer\01Algorithms\gis\pyramids"
-os.chdir(rpath)
+# number of threads used to read and write the files, gdal releases the GIL while reading/writing the files.
+workers = os.cpu_count()
 
-
-from pyramids.dataset import Dataset
-
-Path = "examples/data/raster-folder/"
-F = Dataset.readRastersFolder(Path)
-assert np.shape(F) == (125, 93, 6)
+Path = "tests/data/geotiff/raster-folder/"
+cube = Datacube.read_multiple_files(Path, with_order=True, file_name_data_fmt="%Y.%m.%d")
+cube.open_datacube(workers=workers)
+assert cube.values.shape == (6, 125, 93)
 
 start = "1979-01-02"
 end = "1979-01-05"
 fmt = "%Y-%m-%d"
 
-F = Dataset.readRastersFolder(Path, start=start, end=end, fmt=fmt)
-assert np.shape(F) == (125, 93, 4)
+cube = Datacube.read_multiple_files(
+    Path,
+    with_order=True,
+    file_name_data_fmt="%Y.%m.%d",
+    start=start,
+    end=end,
+    fmt=fmt,
+)
+cube.open_datacube(workers=workers)
+assert cube.values.shape == (4, 125, 93)
 
 # "5_MSWEP_1979.01.06.tif".
+# %% save each time step to a separate file
+cube.to_file("examples/data/raster-folder-saved", workers=workers)
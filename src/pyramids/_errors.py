@@ -1,14 +1,12 @@
 """Custom Errors."""
 
-from loguru import logger
-
 
 class ReadOnlyError(Exception):
     """ReadOnlyError."""
 
     def __init__(self, error_message: str):
         """__init__."""
-        logger.error(error_message)
+        super().__init__(error_message)
 
 
 class DatasetNoFoundError(Exception):
@@ -16,7 +14,7 @@ class DatasetNoFoundError(Exception):
 
     def __init__(self, error_message: str):
         """__init__."""
-        logger.error(error_message)
+        super().__init__(error_message)
 
 
 class NoDataValueError(Exception):
@@ -24,7 +22,7 @@ class NoDataValueError(Exception):
 
     def __init__(self, error_message: str):
         """__init__."""
-        logger.error(error_message)
+        super().__init__(error_message)
 
 
 class AlignmentError(Exception):
@@ -32,7 +30,7 @@ class AlignmentError(Exception):
 
     def __init__(self, error_message: str):
         """__init__."""
-        logger.error(error_message)
+        super().__init__(error_message)
 
 
 class DriverNotExistError(Exception):
@@ -40,7 +38,7 @@ class DriverNotExistError(Exception):
 
     def __init__(self, error_message: str):
         """__init__."""
-        logger.error(error_message)
+        super().__init__(error_message)
 
 
 class FileFormatNotSupported(Exception):
@@ -48,7 +46,7 @@ class FileFormatNotSupported(Exception):
 
     def __init__(self, error_message: str):
         """__init__."""
-        logger.error(error_message)
+        super().__init__(error_message)
 
 
 class OptionalPackageDoesNotExist(Exception):
@@ -56,7 +54,7 @@ class OptionalPackageDoesNotExist(Exception):
 
     def __init__(self, error_message: str):
         """__init__."""
-        logger.error(error_message)
+        super().__init__(error_message)
 
 
 class FailedToSaveError(Exception):
@@ -64,7 +62,7 @@ class FailedToSaveError(Exception):
 
     def __init__(self, error_message: str):
         """__init__."""
-        logger.error(error_message)
+        super().__init__(error_message)
 
 
 class OutOfBoundsError(Exception):
@@ -72,4 +70,4 @@ class OutOfBoundsError(Exception):
 
     def __init__(self, error_message: str):
         """__init__."""
-        logger.error(error_message)
+        super().__init__(error_message)
@@ -260,11 +260,6 @@ def read_file(
     return src
 
 
-def insert_space(inp):
-    """Insert space between the ascii file values."""
-    return str(inp) + "  "
-
-
 def to_ascii(
     arr: np.ndarray, cell_size: int, xmin, ymin, no_data_value, path: str
 ) -> None:
@@ -299,16 +294,12 @@ def to_ascii(
     columns = arr.shape[1]
     # y_lower_side = geotransform[3] - rows * cell_size
     # write the the ASCII file details
-    File = open(path, "w")
-    File.write("ncols         " + str(columns) + "\n")
-    File.write("nrows         " + str(rows) + "\n")
-    File.write("xllcorner     " + str(xmin) + "\n")
-    File.write("yllcorner     " + str(ymin) + "\n")
-    File.write("cellsize      " + str(cell_size) + "\n")
-    File.write("NODATA_value  " + str(no_data_value) + "\n")
-    # write the array
-    for i in range(rows):
-        File.writelines(list(map(insert_space, arr[i, :])))
-        File.write("\n")
-
-    File.close()
+    with open(path, "w") as File:
+        File.write("ncols         " + str(columns) + "\n")
+        File.write("nrows         " + str(rows) + "\n")
+        File.write("xllcorner     " + str(xmin) + "\n")
+        File.write("yllcorner     " + str(ymin) + "\n")
+        File.write("cellsize      " + str(cell_size) + "\n")
+        File.write("NODATA_value  " + str(no_data_value) + "\n")
+        # format each row with one call instead of converting and joining each value separately.
+        np.savetxt(File, arr, fmt="%s", delimiter="  ", newline="  \n")
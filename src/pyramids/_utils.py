@@ -1,11 +1,12 @@
 """Utility module."""
 
-from typing import Union
+from functools import lru_cache
+from typing import Any, Dict, Union
 import yaml
 import datetime as dt
 import numpy as np
 from pandas import DataFrame
-from osgeo import gdal, ogr, gdalconst  # gdal_array,
+from osgeo import gdal, ogr, osr, gdalconst  # gdal_array,
 from osgeo.gdal import Dataset
 from pyramids._errors import OptionalPackageDoesNotExist, DriverNotExistError
 from pyramids import __path__
@@ -121,6 +122,27 @@ DTYPE_CONVERSION_DF = DataFrame(
     data=list(zip(GDAL_DTYPE_CODE, DTYPE_NAMES, NUMPY_DTYPE, GDAL_DTYPE, OGR_DTYPE)),
 )
 
+# lookup dictionaries built once from the conversion table, when a type maps to more than one entry, the first one
+# is used (the same as the first match in the table).
+NUMPY_TO_GDAL_DTYPE = {}
+GDAL_TO_NUMPY_DTYPE = {}
+GDAL_TO_DTYPE_NAME = {}
+GDAL_TO_OGR_DTYPE = {}
+OGR_TO_NUMPY_DTYPE = {}
+for _name, _numpy, _gdal, _ogr in zip(DTYPE_NAMES, NUMPY_DTYPE, GDAL_DTYPE, OGR_DTYPE):
+    if _numpy is not None:
+        NUMPY_TO_GDAL_DTYPE.setdefault(np.dtype(_numpy), _gdal)
+    GDAL_TO_NUMPY_DTYPE.setdefault(_gdal, _numpy)
+    GDAL_TO_DTYPE_NAME.setdefault(_gdal, _name)
+    GDAL_TO_OGR_DTYPE.setdefault(_gdal, _ogr)
+    if _ogr is not None:
+        OGR_TO_NUMPY_DTYPE.setdefault(_ogr, _numpy)
+# since there are more than one numpy dtype for the ogr.OFTInteger (0), and the ogr.OFTInteger64 (12),
+# int32 is used for 0 and int64 for 12.
+OGR_TO_NUMPY_DTYPE.update(
+    {ogr.OFTInteger: np.int32, ogr.OFTInteger64: np.int64, ogr.OFTReal: np.float64}
+)
+
 COLOR_INTERPRETATIONS = [
     gdal.GCI_Undefined,  # 0
     gdal.GCI_GrayIndex,  # 1
@@ -242,12 +264,13 @@ def numpy_to_gdal_dtype(arr: Union[np.ndarray, np.dtype, str]) -> int:
         raise ValueError(
             "The given input is not a numpy array or a numpy data type, please provide a valid input"
         )
+    if np_dtype not in NUMPY_TO_GDAL_DTYPE:
+        raise ValueError(
+            f"The given numpy data type is not supported: {np_dtype}, available types are: "
+            f"{list(NUMPY_TO_GDAL_DTYPE.keys())}"
+        )
     # integer as gdal does not accept the dtype if it is int64
-    gdal_type = int(
-        DTYPE_CONVERSION_DF.loc[
-            DTYPE_CONVERSION_DF["numpy"] == np_dtype, "gdal"
-        ].values[0]
-    )
+    gdal_type = int(NUMPY_TO_GDAL_DTYPE[np_dtype])
     return gdal_type
 
 
@@ -277,28 +300,13 @@ def ogr_to_numpy_dtype(dtype_code: int):
     -------
     Numpy data type
     """
-    # since there are more than one numpy dtype for the ogr.OFTInteger (0), and the ogr.OFTInteger64 (12),
-    # we will return int32 for 0 and int64 for 12.
-    if dtype_code == 0:
-        numpy_dtype = np.int32
-    elif dtype_code == 12:
-        numpy_dtype = np.int64
-    elif dtype_code == 2:
-        numpy_dtype = np.float64
-    else:
-        numpy_dtype = DTYPE_CONVERSION_DF.loc[
-            DTYPE_CONVERSION_DF["ogr"] == dtype_code, "numpy"
-        ]
-
-        if len(numpy_dtype) == 0:
-            raise ValueError(
-                f"The given OGR data type is not supported: {dtype_code}, available types are: "
-                f"{DTYPE_CONVERSION_DF['ogr'].unique().tolist()}"
-            )
-        else:
-            numpy_dtype = numpy_dtype.values[0]
+    if dtype_code not in OGR_TO_NUMPY_DTYPE:
+        raise ValueError(
+            f"The given OGR data type is not supported: {dtype_code}, available types are: "
+            f"{DTYPE_CONVERSION_DF['ogr'].unique().tolist()}"
+        )
 
-    return numpy_dtype
+    return OGR_TO_NUMPY_DTYPE[dtype_code]
 
 
 def gdal_to_numpy_dtype(dtype: int) -> str:
@@ -312,14 +320,12 @@ def gdal_to_numpy_dtype(dtype: int) -> str:
     -------
     str
     """
-    gdal_dtypes = DTYPE_CONVERSION_DF.loc[DTYPE_CONVERSION_DF["gdal"] == dtype, "numpy"]
-    if len(gdal_dtypes) == 0:
+    if dtype not in GDAL_TO_NUMPY_DTYPE:
         raise ValueError(
             f"The given GDAL data type is not supported: {dtype}, available types are: "
             f"{DTYPE_CONVERSION_DF['gdal'].unique().tolist()}"
         )
-    else:
-        gdal_dtypes = gdal_dtypes.values[0].__name__
+    gdal_dtypes = GDAL_TO_NUMPY_DTYPE[dtype].__name__
 
     return gdal_dtypes
 
@@ -340,11 +346,10 @@ def gdal_to_ogr_dtype(src: Dataset, band: int = 1):
     """
     band = src.GetRasterBand(band)
     gdal_dtype = band.DataType
-    return int(
-        DTYPE_CONVERSION_DF.loc[
-            DTYPE_CONVERSION_DF["gdal"] == gdal_dtype, "ogr"
-        ].values[0]
-    )
+    return int(GDAL_TO_OGR_DTYPE[gdal_dtype])
+
+
+TIME_UNITS = ["microseconds", "milliseconds", "seconds", "minutes", "hours", "days"]
 
 
 def create_time_conversion_func(time: str) -> callable:
@@ -362,47 +367,93 @@ def create_time_conversion_func(time: str) -> callable:
     """
     time_unit, start = time.split(" since ")
     datum = dt.datetime.strptime(start, "%Y-%m-%d")
+    # check the unit once here instead of comparing the unit string for every time step.
+    if time_unit not in TIME_UNITS:
+        raise ValueError(f"The given time unit is not available: {time_unit}")
 
     def ordinal_to_date(time_step: int):
-        if time_unit == "microseconds":
-            gregorian = datum + dt.timedelta(microseconds=time_step)
-        elif time_unit == "milliseconds":
-            gregorian = datum + dt.timedelta(milliseconds=time_step)
-        elif time_unit == "seconds":
-            gregorian = datum + dt.timedelta(seconds=time_step)
-        elif time_unit == "hours":
-            gregorian = datum + dt.timedelta(hours=time_step)
-        elif time_unit == "minutes":
-            gregorian = datum + dt.timedelta(minutes=time_step)
-        elif time_unit == "hours":
-            gregorian = datum + dt.timedelta(hours=time_step)
-        elif time_unit == "days":
-            gregorian = datum + dt.timedelta(days=time_step)
-        else:
-            raise ValueError(f"The given time unit is not available: {time_unit}")
-        return gregorian
+        return datum + dt.timedelta(**{time_unit: time_step})
 
     return ordinal_to_date
 
 
+@lru_cache(maxsize=64)
+def epsg_to_wkt(epsg: int) -> str:
+    """Get the WKT of the coordinate reference system of an epsg number.
+
+        - the result is cached, so the PROJ database is queried only once for each epsg number.
+
+    Parameters
+    ----------
+    epsg: [int]
+        epsg number.
+
+    Returns
+    -------
+    str:
+        WKT string of the coordinate reference system.
+    """
+    sr = osr.SpatialReference()
+    sr.ImportFromEPSG(int(epsg))
+    return sr.ExportToWkt()
+
+
+@lru_cache(maxsize=16)
+def wkt_to_sr(wkt: str) -> osr.SpatialReference:
+    """Get the spatial reference object of a WKT string.
+
+        - the result is cached and shared between the callers, so it should not be modified.
+
+    Parameters
+    ----------
+    wkt: [str]
+        WKT string of the coordinate reference system.
+
+    Returns
+    -------
+    SpatialReference
+    """
+    return osr.SpatialReference(wkt=wkt)
+
+
 class Catalog:
     """Data Catalog."""
 
     def __init__(self, raster_driver=True):
         """Initialize the catalog."""
         if raster_driver:
-            path = "gdal_drivers.yaml"
+            self._path = "gdal_drivers.yaml"
         else:
-            path = "ogr_drivers.yaml"
-        self.catalog = self._get_gdal_catalog(path)
+            self._path = "ogr_drivers.yaml"
+
+    @property
+    def catalog(self) -> Dict[str, Any]:
+        """Driver catalog.
+
+        the yaml file is parsed the first time the catalog is used, and the parsed catalog is shared between all the
+        instances.
+        """
+        return self._get_gdal_catalog(self._path)
 
     @staticmethod
+    @lru_cache(maxsize=2)
     def _get_gdal_catalog(path: str):
         with open(f"{__path__[0]}/{path}", "r") as stream:
             gdal_catalog = yaml.safe_load(stream)
 
         return gdal_catalog
 
+    @staticmethod
+    @lru_cache(maxsize=2)
+    def _get_extension_index(path: str) -> Dict[str, str]:
+        """Map each extension to the first driver that uses it in the catalog."""
+        index = {}
+        for key, value in Catalog._get_gdal_catalog(path).items():
+            if value.get("extension") is not None:
+                index.setdefault(value.get("extension"), key)
+
+        return index
+
     def get_driver(self, driver: str):
         """Get Driver data from the catalog."""
         return self.catalog.get(driver)
@@ -425,14 +476,8 @@ class Catalog:
         str:
             Driver name.
         """
-        try:
-            key = next(
-                key
-                for key, value in self.catalog.items()
-                if value.get("extension") is not None
-                and value.get("extension") == extension
-            )
-        except StopIteration:
+        key = self._get_extension_index(self._path).get(extension)
+        if key is None:
             raise DriverNotExistError(
                 f"The given extension: {extension} is not associated with any driver in the "
                 "driver catalog, if this driver is supported by gdal please open and issue to "
@@ -16,6 +16,7 @@ from osgeo.osr import SpatialReference
 
 from pyramids._utils import (
     Catalog,
+    epsg_to_wkt,
 )
 from pyramids.featurecollection import FeatureCollection
 
@@ -489,8 +490,7 @@ class AbstractDataset(ABC):
                 self.raster.SetProjection(crs)
                 self._epsg = FeatureCollection.get_epsg_from_prj(crs)
             else:
-                sr = AbstractDataset._create_sr_from_epsg(epsg)
-                self.raster.SetProjection(sr.ExportToWkt())
+                self.raster.SetProjection(epsg_to_wkt(epsg))
                 self._epsg = epsg
 
     @abstractmethod
@@ -563,8 +563,8 @@ class AbstractDataset(ABC):
         -------
         SpatialReference object
         """
-        sr = osr.SpatialReference()
-        sr.ImportFromEPSG(int(epsg))
+        # build the object from the cached WKT, to avoid querying the PROJ database for each call.
+        sr = osr.SpatialReference(wkt=epsg_to_wkt(int(epsg)))
         return sr
 
     @abstractmethod
@@ -585,7 +585,9 @@ class AbstractDataset(ABC):
 
     @abstractmethod
     def _set_no_data_value(
-        self, no_data_value: Union[Any, list] = DEFAULT_NO_DATA_VALUE
+        self,
+        no_data_value: Union[Any, list] = DEFAULT_NO_DATA_VALUE,
+        fill: bool = True,
     ):
         """Set the NoDataValue.
 
@@ -601,6 +603,9 @@ class AbstractDataset(ABC):
         ----------
         no_data_value: [numeric]
             no data value to fill the masked part of the array.
+        fill: [bool]
+            True to fill the bands with the no_data_value. Use False when the whole array of each band is going to be
+            written right after, to avoid writing the cells twice. Default is True.
         """
         pass
 
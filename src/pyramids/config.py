@@ -111,7 +111,10 @@ class Config:
         >>> config = Config(config_file="config.yaml")
         >>> settings = config.load_config()
         >>> print(settings) # doctest: +NORMALIZE_WHITESPACE
-        {'gdal': {'GDAL_CACHEMAX': '512',
+        {'gdal': {'GDAL_CACHEMAX': '1024',
+          'GDAL_NUM_THREADS': 'ALL_CPUS',
+          'GDAL_DISABLE_READDIR_ON_OPEN': 'TRUE',
+          'VSI_CACHE': 'TRUE',
           'GDAL_PAM_ENABLED': 'YES',
           'GDAL_VRT_ENABLE_PYTHON': 'YES',
           'GDAL_TIFF_INTERNAL_MASK': 'NO'},
@@ -133,6 +136,8 @@ class Config:
         -----
         - Uses the `dynamic_env_variables` method to locate the GDAL plugins path.
         - By default, GDAL and OGR suppress exceptions unless explicitly enabled using `UseExceptions`.
+        - The GDAL/OGR options that are already set as environment variables (e.g. `GDAL_CACHEMAX`) are not
+            overridden, so they can be tuned for each machine without changing the configuration file.
 
         Examples
         --------
@@ -147,9 +152,11 @@ class Config:
         ogr.UseExceptions()
         # gdal.ErrorReset()
         for key, value in self.config.get("gdal", {}).items():
-            gdal.SetConfigOption(key, value)
+            if key not in os.environ:
+                gdal.SetConfigOption(key, value)
         for key, value in self.config.get("ogr", {}).items():
-            gdal.SetConfigOption(key, value)
+            if key not in os.environ:
+                gdal.SetConfigOption(key, value)
 
         gdal_plugins_path = self.dynamic_env_variables()
 
@@ -2,11 +2,11 @@
 
 import os
 import re
-from loguru import logger
+from concurrent.futures import ThreadPoolExecutor
 import datetime as dt
 import pandas as pd
 from pathlib import Path
-from typing import List, Union, Any, Callable, Dict
+from typing import List, Optional, Tuple, Union, Any, Callable, Dict
 import numpy as np
 from osgeo import gdal
 from pyramids.dataset import Dataset
@@ -14,13 +14,6 @@ from pyramids._errors import DatasetNoFoundError
 from pyramids.abstract_dataset import CATALOG
 from pyramids._utils import import_cleopatra
 
-try:
-    from osgeo_utils import gdal_merge
-except ModuleNotFoundError:  # pragma: no cover
-    logger.warning(  # pragma: no cover
-        "osgeo_utils module does not exist try install pip install osgeo-utils "
-    )
-
 
 class Datacube:
     """DataCube."""
@@ -93,7 +86,11 @@ class Datacube:
 
     @property
     def shape(self):
-        """Number of rows."""
+        """Shape of the datacube (time steps, rows, columns).
+
+        the shape is taken from the files' metadata, so it is available before reading the values with
+        `open_datacube`.
+        """
         return self.time_length, self.rows, self.columns
 
     @property
@@ -208,9 +205,13 @@ class Datacube:
             # check whither the path exists or not
             if not os.path.exists(path):
                 raise FileNotFoundError("The path you have provided does not exist")
-            # get a list of all files
-            files = os.listdir(path)
-            files = [i for i in files if i.endswith(extension)]
+            # get a list of all files with the given extension in one pass over the directory entries.
+            with os.scandir(path) as entries:
+                files = [
+                    i.name
+                    for i in entries
+                    if i.name.endswith(extension) and i.is_file()
+                ]
             # files = glob.glob(os.path.join(path, "*.tif"))
             # check whether there are files or not inside the folder
             if len(files) < 1:
@@ -220,23 +221,25 @@ class Datacube:
 
         # to sort the files in the same order as the first number in the name
         if with_order:
-            match_str_fn = lambda x: re.search(regex_string, x)
-            list_dates = list(map(match_str_fn, files))
+            # compile the pattern once for all the file names.
+            pattern = re.compile(regex_string)
+            list_dates = [pattern.search(i) for i in files]
 
             if None in list_dates:
                 raise ValueError(
                     "The date format/separator given does not match the file names"
                 )
+            list_dates = [i.group() for i in list_dates]
             if date:
                 if file_name_data_fmt is None:
                     raise ValueError(
                         f"To read the raster with a certain order (with_order = {with_order}, then you have to enter "
                         f"the value of the parameter file_name_data_fmt(given: {file_name_data_fmt})"
                     )
-                fn = lambda x: dt.datetime.strptime(x.group(), file_name_data_fmt)
+                # parse all the dates in one vectorized call instead of calling strptime for each file.
+                list_dates = pd.to_datetime(list_dates, format=file_name_data_fmt)
             else:
-                fn = lambda x: int(x.group())
-            list_dates = list(map(fn, list_dates))
+                list_dates = [int(i) for i in list_dates]
 
             df = pd.DataFrame()
             df["files"] = files
@@ -249,28 +252,19 @@ class Datacube:
                 start = dt.datetime.strptime(start, fmt)
                 end = dt.datetime.strptime(end, fmt)
 
-                files = (
-                    df.loc[start <= df["date"], :]
-                    .loc[df["date"] <= end, "files"]
-                    .values
-                )
-            else:
-                files = (
-                    df.loc[start <= df["date"], :]
-                    .loc[df["date"] <= end, "files"]
-                    .values
-                )
+            # one boolean mask over the date column.
+            files = df.loc[(start <= df["date"]) & (df["date"] <= end), "files"].values
 
         if not isinstance(path, list):
             # add the path to all the files
-            files = [f"{path}/{i}" for i in files]
+            files = [os.path.join(path, i) for i in files]
         # create a 3d array with the 2d dimension of the first raster and the len
         # of the number of rasters in the folder
         sample = Dataset.read_file(files[0])
 
         return cls(sample, len(files), files)
 
-    def open_datacube(self, band: int = 0):
+    def open_datacube(self, band: int = 0, workers: int = 1):
         """open_datacube.
 
             Read values form the given bands as Arrays for all files
@@ -279,6 +273,8 @@ class Datacube:
         ----------
         band: [int]
             index of the band you want to read default is 0.
+        workers: [int]
+            number of threads used to read (and parse, in case of ascii files) the files concurrently. Default is 1.
 
         Returns
         -------
@@ -294,20 +290,123 @@ class Datacube:
             raise ValueError(
                 f"the raster has only {self.base.band_count} check the given band number"
             )
+        # keep the precision of the files (i.e. float32) instead of upcasting the cube to float64, integer rasters
+        # are read as float64 to hold the nan fill value.
+        dtype = self.base.numpy_dtype[band]
+        if not np.issubdtype(dtype, np.floating):
+            dtype = np.float64
         # fill the array with no_data_value data
-        self._values = np.ones(
+        self._values = np.full(
             (
                 self.time_length,
                 self.base.rows,
                 self.base.columns,
-            )
+            ),
+            np.nan,
+            dtype=dtype,
+        )
+
+        # read the base geotransform once, the base dataset handle is not shared with the reading threads.
+        base_geotransform = self.base.raster.GetGeoTransform(can_return_null=True)
+
+        def read_file(i: int, raster_i: gdal.Dataset = None):
+            if raster_i is None:
+                raster_i = gdal.Open(f"{self.files[i]}")
+                self._check_file_grid(raster_i, self.files[i], base_geotransform)
+            # read directly into the time step of the cube instead of reading into a new array and copying it.
+            raster_i.GetRasterBand(band + 1).ReadAsArray(buf_obj=self._values[i, :, :])
+
+        if workers > 1:
+            # gdal releases the GIL while reading and parsing the files, and each thread fills its own time step.
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(read_file, range(len(self.files))))
+            return
+
+        # open each file once, the same handles are checked and then stacked.
+        rasters = []
+        for path in self.files:
+            raster_i = gdal.Open(f"{path}")
+            self._check_file_grid(raster_i, path, base_geotransform)
+            rasters.append(raster_i)
+
+        if base_geotransform is None:
+            # BuildVRT needs georeferenced files, read the files without a geotransform one by one.
+            for i, raster_i in enumerate(rasters):
+                read_file(i, raster_i)
+            return
+
+        # stack the files as the bands of one in-memory VRT, and read the whole cube with one call instead of
+        # reading each file in a python loop.
+        vrt = gdal.BuildVRT(
+            "",
+            rasters,
+            options=gdal.BuildVRTOptions(separate=True, bandList=[band + 1]),
         )
-        self._values[:, :, :] = np.nan
+        # BuildVRT skips the files with a different crs, and covers the union extent of the files, gdal would
+        # resample the VRT silently into the cube if it does not match the cube.
+        if vrt.RasterCount != self.time_length:
+            raise ValueError(
+                f"Only {vrt.RasterCount} of the {self.time_length} files could be stacked, check that all the "
+                "files have the same coordinate reference system"
+            )
+        if (vrt.RasterYSize, vrt.RasterXSize) != (self.base.rows, self.base.columns):
+            raise ValueError(
+                f"The stacked files have {vrt.RasterYSize} rows and {vrt.RasterXSize} columns, while the "
+                f"datacube has {self.base.rows} rows and {self.base.columns} columns"
+            )
+        vrt.ReadAsArray(buf_obj=self._values)
+        vrt = None
+
+    def _check_file_grid(
+        self, src: gdal.Dataset, path: str, base_geotransform: Optional[Tuple]
+    ):
+        """Check that a file has the same dimensions and geotransform of the base dataset.
 
-        for i, file_i in enumerate(self.files):
-            # read the tif file
-            raster_i = gdal.Open(f"{file_i}")
-            self._values[i, :, :] = raster_i.GetRasterBand(band + 1).ReadAsArray()
+            - gdal resamples a raster into a buffer with a different shape instead of raising an error, so a file
+            with different dimensions would be read into the cube silently.
+            - the VRT stack used to read the cube covers the union extent of the files, so a shifted file would also
+            be resampled into the cube.
+            - the geotransforms match if the grids of the file and the base dataset are less than 1/1000 of a cell
+            apart at any cell, files without a geotransform are only accepted if the base has no geotransform.
+
+        Parameters
+        ----------
+        src: [gdal.Dataset]
+            the opened file.
+        path: [str]
+            path of the file (used in the error message).
+        base_geotransform: [Tuple/None]
+            geotransform of the base dataset, None if the base dataset has no geotransform.
+
+        Raises
+        ------
+        ValueError
+            if the rows, columns or geotransform of the file are different from the base dataset.
+        """
+        rows, columns = self.base.rows, self.base.columns
+        if src.RasterYSize != rows or src.RasterXSize != columns:
+            raise ValueError(
+                f"The file: {path} has {src.RasterYSize} rows and {src.RasterXSize} columns, while the datacube "
+                f"has {rows} rows and {columns} columns"
+            )
+        geotransform = src.GetGeoTransform(can_return_null=True)
+        if geotransform is None or base_geotransform is None:
+            if geotransform is base_geotransform:
+                return
+            matches = False
+        else:
+            diff = np.abs(np.subtract(geotransform, base_geotransform))
+            # the largest shift between the two grids (origin + the drift of the cell size and rotation over the
+            # grid), compared to a fraction of the cell size instead of a relative tolerance of the coordinates.
+            shift_x = diff[0] + columns * diff[1] + rows * diff[2]
+            shift_y = diff[3] + columns * diff[4] + rows * diff[5]
+            tolerance = 1e-3 * min(abs(base_geotransform[1]), abs(base_geotransform[5]))
+            matches = shift_x <= tolerance and shift_y <= tolerance
+        if not matches:
+            raise ValueError(
+                f"The geotransform of the file: {path} {geotransform} is different from the geotransform "
+                f"of the datacube {base_geotransform}"
+            )
 
     @property
     def values(self) -> np.ndarray:
@@ -398,6 +497,26 @@ class Datacube:
         dst.GetRasterBand(1).WriteArray(arr)
         return Dataset(dst)
 
+    def _iter_time_steps(self):
+        """Iterate over the time steps.
+
+            - yield the same in-memory Dataset for each time step after writing the time step array to it, so the
+            driver lookup, the in-memory copy of the base dataset, and the Dataset object are created only once.
+
+        Returns
+        -------
+        Generator:
+            (index, Dataset) for each time step.
+        """
+        if not hasattr(self, "values"):
+            raise DatasetNoFoundError("please read the dataset first")
+        dst = gdal.GetDriverByName("MEM").CreateCopy("", self.base.raster, 0)
+        src = Dataset(dst)
+        band = dst.GetRasterBand(1)
+        for i in range(self.time_length):
+            band.WriteArray(self._values[i, :, :])
+            yield i, src
+
     def plot(self, band: int = 0, exclude_value: Any = None, **kwargs):
         """Read Array.
 
@@ -499,7 +618,12 @@ class Datacube:
         return cleo
 
     def to_file(
-        self, path: Union[str, List[str]], driver: str = "geotiff", band: int = 0
+        self,
+        path: Union[str, List[str]],
+        driver: str = "geotiff",
+        band: int = 0,
+        workers: int = 1,
+        cog: bool = False,
     ):
         """Save to geotiff format.
 
@@ -515,6 +639,10 @@ class Datacube:
             driver = "geotiff".
         band: [int]
             band index, needed only in case of ascii drivers. Default is 1.
+        workers: [int]
+            number of threads used to write the files concurrently. Default is 1.
+        cog: [bool]
+            True to save the geotiff files as Cloud Optimized GeoTIFFs. Default is False.
 
         Examples
         --------
@@ -525,20 +653,47 @@ class Datacube:
         ext = CATALOG.get_extension(driver)
 
         if isinstance(path, str):
-            if not Path(path).exists():
-                Path(path).mkdir(parents=True, exist_ok=True)
+            Path(path).mkdir(parents=True, exist_ok=True)
             path = [f"{path}/{i}.{ext}" for i in range(self.time_length)]
         else:
             if not len(path) == self.time_length:
                 raise ValueError(
                     f"Length of the given paths: {len(path)} does not equal number of rasters in the data cube: {self.time_length}"
                 )
-            if not Path(path[0]).parent.exists():
-                Path(path[0]).parent.mkdir(parents=True, exist_ok=True)
+            # create each distinct parent directory once.
+            for parent in {Path(i).parent for i in path}:
+                parent.mkdir(parents=True, exist_ok=True)
 
-        for i in range(self.time_length):
-            src = self.iloc(i)
-            src.to_file(path[i], band=band)
+        if not hasattr(self, "values"):
+            raise DatasetNoFoundError("please read the dataset first")
+        if workers > 1:
+            # gdal dataset handles are not thread-safe, so the base properties are read here once, and each thread
+            # builds its own in-memory dataset from them instead of copying the shared base dataset.
+            rows, columns = self.base.rows, self.base.columns
+            dtype = self.base.gdal_dtype[0]
+            geotransform = self.base.geotransform
+            projection = self.base.crs
+            no_data_value = self.base.no_data_value[0]
+
+            def write_fn(i: int):
+                dst = Dataset._create_dataset(columns, rows, 1, dtype)
+                dst.SetGeoTransform(geotransform)
+                dst.SetProjection(projection)
+                if no_data_value is not None:
+                    dst.GetRasterBand(1).SetNoDataValue(no_data_value)
+                dst.GetRasterBand(1).WriteArray(self._values[i, :, :])
+                # gdal releases the GIL while writing the file.
+                Dataset(dst).to_file(path[i], band=band, cog=cog)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(write_fn, range(self.time_length)))
+        else:
+            # write each time step into one in-memory dataset and copy it to disk, instead of creating a new
+            # in-memory copy of the base dataset for each time step.
+            dst = gdal.GetDriverByName("MEM").CreateCopy("", self.base.raster, 0)
+            for i in range(self.time_length):
+                dst.GetRasterBand(1).WriteArray(self._values[i, :, :])
+                Dataset(dst).to_file(path[i], band=band, cog=cog)
 
     def to_crs(
         self,
@@ -575,23 +730,20 @@ class Datacube:
         >>> src = Dataset.read_file("path/raster_name.tif")
         >>> projected_raster = src.to_crs(to_epsg=3857)
         """
-        for i in range(self.time_length):
-            src = self.iloc(i)
+        for i, src in self._iter_time_steps():
             dst = src.to_crs(
                 to_epsg, method=method, maintain_alignment=maintain_alignment
             )
             arr = dst.read_array()
             if i == 0:
                 # create the array
-                array = (
-                    np.ones(
-                        (
-                            self.time_length,
-                            arr.shape[0],
-                            arr.shape[1],
-                        )
-                    )
-                    * np.nan
+                array = np.full(
+                    (
+                        self.time_length,
+                        arr.shape[0],
+                        arr.shape[1],
+                    ),
+                    np.nan,
                 )
             array[i, :, :] = arr
 
@@ -634,18 +786,12 @@ class Datacube:
         >>> out_path = "examples/GIS/data/crop_aligned_folder/"
         >>> Datacube.crop(dem_path, src_path, out_path)
         """
-        for i in range(self.time_length):
-            src = self.iloc(i)
+        for i, src in self._iter_time_steps():
             dst = src.crop(mask, touch=touch)
             arr = dst.read_array()
             if i == 0:
                 # create the array
-                array = (
-                    np.ones(
-                        (self.time_length, arr.shape[0], arr.shape[1]),
-                    )
-                    * np.nan
-                )
+                array = np.full((self.time_length, arr.shape[0], arr.shape[1]), np.nan)
 
             array[i, :, :] = arr
 
@@ -827,18 +973,12 @@ class Datacube:
         if not isinstance(alignment_src, Dataset):
             raise TypeError("alignment_src input should be a Dataset object")
 
-        for i in range(self.time_length):
-            src = self.iloc(i)
+        for i, src in self._iter_time_steps():
             dst = src.align(alignment_src)
             arr = dst.read_array()
             if i == 0:
                 # create the array
-                array = (
-                    np.ones(
-                        (self.time_length, arr.shape[0], arr.shape[1]),
-                    )
-                    * np.nan
-                )
+                array = np.full((self.time_length, arr.shape[0], arr.shape[1]), np.nan)
 
             array[i, :, :] = arr
 
@@ -856,7 +996,8 @@ class Datacube:
     ):
         """merge.
 
-            merges group of rasters into one raster
+            merges group of rasters into one raster, the rasters are merged in-process with a multithreaded
+            `gdal.Warp`, and the output cell size is the cell size of the first raster.
 
         Parameters
         ----------
@@ -876,27 +1017,25 @@ class Datacube:
         -------
         None
         """
-        # run the command
-        # cmd = "gdal_merge.py -o merged_image_1.tif"
-        # subprocess.call(cmd.split() + file_list)
-        # vrt = gdal.BuildVRT("merged.vrt", file_list)
-        # src = gdal.Translate("merged_image.tif", vrt)
-
-        parameters = (
-            ["", "-o", dst]
-            + src
-            + [
-                "-co",
-                "COMPRESS=LZW",
-                "-init",
-                str(init),
-                "-a_nodata",
-                str(no_data_value),
-                "-n",
-                str(n),
-            ]
-        )  # '-separate'
-        gdal_merge.main(parameters)
+        first = gdal.Open(src[0])
+        geotransform = first.GetGeoTransform()
+        dtype = first.GetRasterBand(1).DataType
+        first = None
+
+        # warp all the rasters into the output in one call, instead of gdal_merge copying them row by row in python.
+        warp_options = gdal.WarpOptions(
+            format="GTiff",
+            xRes=geotransform[1],
+            yRes=abs(geotransform[5]),
+            srcNodata=str(n),
+            dstNodata=str(no_data_value),
+            warpOptions=[f"INIT_DEST={init}", "NUM_THREADS=ALL_CPUS"],
+            creationOptions=Dataset._gtiff_creation_options(dtype),
+            multithread=True,
+        )
+        merged = gdal.Warp(dst, src, options=warp_options)
+        merged.FlushCache()
+        merged = None
 
     def apply(self, ufunc: Callable):
         """apply.
@@ -952,8 +1091,7 @@ class Datacube:
             values in the maps from the path.
         """
         values = {}
-        for i in range(self.time_length):
-            src = self.iloc(i)
+        for i, src in self._iter_time_steps():
             dict_i = src.overlay(classes_map, exclude_value)
 
             # these are the distinct values from the BaseMap which are keys in the
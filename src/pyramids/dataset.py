@@ -18,6 +18,7 @@ from geopandas.geodataframe import DataFrame, GeoDataFrame
 from loguru import logger
 from osgeo import gdal, ogr, osr
 from osgeo.osr import SpatialReference
+from scipy import ndimage
 
 from pyramids._errors import (
     AlignmentError,
@@ -27,7 +28,8 @@ from pyramids._errors import (
     OutOfBoundsError,
 )
 from pyramids._utils import (
-    DTYPE_CONVERSION_DF,
+    GDAL_TO_DTYPE_NAME,
+    GDAL_TO_NUMPY_DTYPE,
     INTERPOLATION_METHODS,
     gdal_to_numpy_dtype,
     gdal_to_ogr_dtype,
@@ -35,9 +37,11 @@ from pyramids._utils import (
     numpy_to_gdal_dtype,
     color_name_to_gdal_constant,
     gdal_constant_to_color_name,
+    epsg_to_wkt,
+    wkt_to_sr,
 )
 
-from hpc.indexing import get_pixels, get_indices2, get_pixels2, locate_values
+from hpc.indexing import get_indices2, get_pixels2, locate_values
 from pyramids.featurecollection import FeatureCollection
 from pyramids import _io
 from pyramids.abstract_dataset import AbstractDataset
@@ -202,8 +206,7 @@ class Dataset(AbstractDataset):
     @epsg.setter
     def epsg(self, value: int):
         """EPSG number."""
-        sr = Dataset._create_sr_from_epsg(value)
-        self.raster.SetProjection(sr.ExportToWkt())
+        self.raster.SetProjection(epsg_to_wkt(value))
         self.__init__(self._raster)
 
     @property
@@ -550,7 +553,10 @@ class Dataset(AbstractDataset):
         return cls(src, access="read_only" if read_only else "write")
 
     def read_array(
-        self, band: int = None, window: Union[GeoDataFrame, List[int]] = None
+        self,
+        band: int = None,
+        window: Union[GeoDataFrame, List[int]] = None,
+        out: np.ndarray = None,
     ) -> np.ndarray:
         """Read the values stored in a given band.
 
@@ -584,6 +590,10 @@ class Dataset(AbstractDataset):
             - GeoDataFrame:
                 GeoDataFrame with a geometry column filled with a polygon geometries, the function will get the
                 total_bounds of the geodataframe and use it as a window to read the raster.
+        out: np.ndarray, optional
+            array to read the values into, with the same shape of the values to read (bands, rows, columns) or
+            (rows, columns) for a single band. Use a `np.memmap` to read a dataset that does not fit in memory, gdal
+            writes the values directly into the mapped file. Default is None, a new array is created.
 
         Returns
         -------
@@ -636,29 +646,54 @@ class Dataset(AbstractDataset):
             array([[0.14617829, 0.05045189],
                    [0.37358843, 0.32233918]])
 
+        - Read all the bands into a memory-mapped file instead of an in-memory array.
+
+            >>> out = np.memmap("values.dat", dtype=dataset.numpy_dtype[0], mode="w+", shape=(4, 5, 5)) # doctest: +SKIP
+            >>> arr = dataset.read_array(out=out) # doctest: +SKIP
+            >>> out.flush() # doctest: +SKIP
+
         See also
         --------
         Dataset.get_tile : read the dataset in chuncks
         Dataset.get_block_arrangement : get block arrangement to read the dataset in chuncks.
         """
+        if isinstance(window, GeoDataFrame):
+            window = self._convert_polygon_to_window(window)
+
+        if out is not None:
+            # gdal silently resamples the values into a buffer with a different shape, so check it before reading.
+            rows = self.rows if window is None else window[3]
+            columns = self.columns if window is None else window[2]
+            if band is None and self.band_count > 1:
+                shape = (self.band_count, rows, columns)
+            else:
+                shape = (rows, columns)
+            if out.shape != shape:
+                raise ValueError(
+                    f"The shape of the out array {out.shape} should be {shape}"
+                )
+
         if band is None and self.band_count > 1:
             rows = self.rows if window is None else window[3]
             columns = self.columns if window is None else window[2]
-            arr = np.ones(
-                (
-                    self.band_count,
-                    rows,
-                    columns,
-                ),
-                dtype=self.numpy_dtype[0],
-            )
+            if out is None:
+                arr = np.empty(
+                    (
+                        self.band_count,
+                        rows,
+                        columns,
+                    ),
+                    dtype=self.numpy_dtype[0],
+                )
+            else:
+                arr = out
 
-            for i in range(self.band_count):
-                if window is None:
-                    # this line could be replaced with the following line
-                    # arr[i, :, :] = self._iloc(i).ReadAsArray()
-                    arr[i, :, :] = self._raster.GetRasterBand(i + 1).ReadAsArray()
-                else:
+            if window is None:
+                # read all the bands in one call, so drivers that store several bands (time steps) in the same
+                # chunk (e.g. netcdf) decompress each chunk once instead of once per band.
+                self._raster.ReadAsArray(buf_obj=arr)
+            else:
+                for i in range(self.band_count):
                     arr[i, :, :] = self._read_block(i, window)
         else:
             # given band number or the raster has only one band
@@ -670,9 +705,12 @@ class Dataset(AbstractDataset):
                         f"band index should be between 0 and {self.band_count - 1}"
                     )
             if window is None:
-                arr = self._iloc(band).ReadAsArray()
-            else:
+                arr = self._iloc(band).ReadAsArray(buf_obj=out)
+            elif out is None:
                 arr = self._read_block(band, window)
+            else:
+                out[:, :] = self._read_block(band, window)
+                arr = out
 
         return arr
 
@@ -973,18 +1011,12 @@ class Dataset(AbstractDataset):
     @property
     def numpy_dtype(self) -> List[type]:
         """List of the numpy data Type of each band, the data type is a numpy function."""
-        return [
-            DTYPE_CONVERSION_DF.loc[DTYPE_CONVERSION_DF["gdal"] == i, "numpy"].values[0]
-            for i in self.gdal_dtype
-        ]
+        return [GDAL_TO_NUMPY_DTYPE[i] for i in self.gdal_dtype]
 
     @property
     def dtype(self) -> List[str]:
         """List of the data Type of each band as strings."""
-        return [
-            DTYPE_CONVERSION_DF.loc[DTYPE_CONVERSION_DF["gdal"] == i, "name"].values[0]
-            for i in self.gdal_dtype
-        ]
+        return [GDAL_TO_DTYPE_NAME[i] for i in self.gdal_dtype]
 
     def get_block_arrangement(
         self, band: int = 0, x_block_size: int = None, y_block_size: int = None
@@ -1784,6 +1816,48 @@ class Dataset(AbstractDataset):
         fig, ax = cleo.plot(**kwargs)
         return fig, ax
 
+    @staticmethod
+    def _gtiff_creation_options(
+        dtype: int, block_size: Union[int, Tuple[int, int]] = 256
+    ) -> List[str]:
+        """GeoTIFF creation options.
+
+            tiled, compressed with all the cores, and with a predictor that suits the data type.
+
+        Parameters
+        ----------
+        dtype: [int]
+            gdal data type.
+        block_size: [int/Tuple[int, int]]
+            width and height of the tiles, or (block width, block height). GeoTIFF tiles have to be multiples of
+            16, any other block size is written as strips of the given block height. Default is 256.
+
+        Returns
+        -------
+        List[str]
+            creation options.
+        """
+        if isinstance(block_size, int):
+            block_size = (block_size, block_size)
+        block_x, block_y = block_size
+        if block_x % 16 == 0 and block_y % 16 == 0:
+            options = ["TILED=YES", f"BLOCKXSIZE={block_x}", f"BLOCKYSIZE={block_y}"]
+        else:
+            options = [f"BLOCKYSIZE={block_y}"]
+        options += [
+            "COMPRESS=DEFLATE",
+            "NUM_THREADS=ALL_CPUS",
+            "SPARSE_OK=TRUE",
+            "BIGTIFF=IF_SAFER",
+            "INTERLEAVE=BAND",
+        ]
+        dtype_name = gdal.GetDataTypeName(dtype)
+        if dtype_name.startswith("Float"):
+            options.append("PREDICTOR=3")
+        elif not dtype_name.startswith("C"):
+            options.append("PREDICTOR=2")
+        return options
+
     @staticmethod
     def _create_dataset(
         cols: int,
@@ -1832,9 +1906,13 @@ class Dataset(AbstractDataset):
                     raise TypeError(
                         "The path to save the created raster should end with .tif"
                     )
-            # LZW is a lossless compression method achieve the highest compression but with a lot of computations.
+            if driver == "GTiff":
+                options = Dataset._gtiff_creation_options(dtype)
+            else:
+                # LZW is a lossless compression method achieve the highest compression but with a lot of computations.
+                options = ["COMPRESS=LZW"]
             src = gdal.GetDriverByName(driver).Create(
-                path, cols, rows, bands, dtype, ["COMPRESS=LZW"]
+                path, cols, rows, bands, dtype, options
             )
         else:
             # for memory drivers
@@ -1935,7 +2013,6 @@ class Dataset(AbstractDataset):
         # Create the driver.
         dtype = numpy_to_gdal_dtype(dtype)
         dst = Dataset._create_dataset(columns, rows, bands, dtype, path=path)
-        sr = Dataset._create_sr_from_epsg(epsg)
         geotransform = (
             top_left_corner[0],
             cell_size,
@@ -1946,7 +2023,7 @@ class Dataset(AbstractDataset):
         )
         dst.SetGeoTransform(geotransform)
         # Set the projection.
-        dst.SetProjection(sr.ExportToWkt())
+        dst.SetProjection(epsg_to_wkt(epsg))
 
         dst = cls(dst, access="write")
         if no_data_value is not None:
@@ -2093,18 +2170,23 @@ class Dataset(AbstractDataset):
             cols, rows, bands, dtype, driver=driver_type, path=path
         )
 
-        srse = Dataset._create_sr_from_epsg(epsg=epsg)
-        dst_ds.SetProjection(srse.ExportToWkt())
+        dst_ds.SetProjection(epsg_to_wkt(epsg))
         dst_ds.SetGeoTransform(geo)
 
         dst_obj = Dataset(dst_ds, access="write")
-        dst_obj._set_no_data_value(no_data_value=no_data_value)
+        dst_obj._set_no_data_value(no_data_value=no_data_value, fill=False)
 
-        if bands == 1:
-            dst_obj.raster.GetRasterBand(1).WriteArray(arr)
-        else:
-            for i in range(bands):
-                dst_obj.raster.GetRasterBand(i + 1).WriteArray(arr[i, :, :])
+        for i in range(bands):
+            band = dst_obj.raster.GetRasterBand(i + 1)
+            band_arr = arr if bands == 1 else arr[i, :, :]
+            if path is None:
+                band.WriteArray(band_arr)
+            else:
+                # write one row of tiles at a time, so each call covers whole blocks and the block cache only needs
+                # to hold one row of tiles instead of the whole band.
+                block_rows = band.GetBlockSize()[1]
+                for yoff in range(0, rows, block_rows):
+                    band.WriteArray(band_arr[yoff : yoff + block_rows, :], 0, yoff)
 
         # flush data to disk
         if path is not None:
@@ -2186,7 +2268,7 @@ class Dataset(AbstractDataset):
         dst.SetProjection(src.crs)
         # setting the NoDataValue does not accept double precision numbers
         dst_obj = cls(dst, access="write")
-        dst_obj._set_no_data_value(no_data_value=src.no_data_value[0])
+        dst_obj._set_no_data_value(no_data_value=src.no_data_value[0], fill=False)
 
         if bands == 1:
             dst_obj.raster.GetRasterBand(1).WriteArray(array)
@@ -2288,8 +2370,7 @@ class Dataset(AbstractDataset):
                 self.raster.SetProjection(crs)
                 self._epsg = FeatureCollection.get_epsg_from_prj(crs)
             else:
-                sr = Dataset._create_sr_from_epsg(epsg)
-                self.raster.SetProjection(sr.ExportToWkt())
+                self.raster.SetProjection(epsg_to_wkt(epsg))
                 self._epsg = epsg
 
     def to_crs(
@@ -2436,8 +2517,8 @@ class Dataset(AbstractDataset):
         -------
         SpatialReference object
         """
-        sr = osr.SpatialReference()
-        sr.ImportFromEPSG(int(epsg))
+        # build the object from the cached WKT, to avoid querying the PROJ database for each call.
+        sr = osr.SpatialReference(wkt=epsg_to_wkt(int(epsg)))
         return sr
 
     def _get_band_names(self) -> List[str]:
@@ -2524,7 +2605,9 @@ class Dataset(AbstractDataset):
         return no_data_value
 
     def _set_no_data_value(
-        self, no_data_value: Union[Any, list] = DEFAULT_NO_DATA_VALUE
+        self,
+        no_data_value: Union[Any, list] = DEFAULT_NO_DATA_VALUE,
+        fill: bool = True,
     ):
         """setNoDataValue.
 
@@ -2540,6 +2623,9 @@ class Dataset(AbstractDataset):
         ----------
         no_data_value: [numeric]
             no data value to fill the masked part of the array.
+        fill: [bool]
+            True to fill the bands with the no_data_value. Use False when the whole array of each band is going to be
+            written right after, to avoid writing the cells twice. Default is True.
         """
         if not isinstance(no_data_value, list):
             no_data_value = [no_data_value] * self.band_count
@@ -2551,7 +2637,7 @@ class Dataset(AbstractDataset):
                 # now the no_data_value is converted to the dtype of the raster bands and updated in the
                 # dataset attribute, gdal no_data_value attribute, used to fill the raster band.
                 # from here you have to use the no_data_value stored in the no_data_value attribute as it is updated.
-                self._set_no_data_value_backend(band, no_data_value[band])
+                self._set_no_data_value_backend(band, no_data_value[band], fill=fill)
             except Exception as e:
                 if str(e).__contains__(
                     "Attempt to write to read only dataset in GDALRasterBand::Fill()."
@@ -2564,10 +2650,12 @@ class Dataset(AbstractDataset):
                     "in method 'Band_SetNoDataValue', argument 2 of type 'double'"
                 ):
                     self._set_no_data_value_backend(
-                        band, np.float64(no_data_value[band])
+                        band, np.float64(no_data_value[band]), fill=fill
                     )
                 else:
-                    self._set_no_data_value_backend(band, DEFAULT_NO_DATA_VALUE)
+                    self._set_no_data_value_backend(
+                        band, DEFAULT_NO_DATA_VALUE, fill=fill
+                    )
                     logger.warning(
                         "the type of the given no_data_value differs from the dtype of the raster"
                         f"no_data_value now is set to {DEFAULT_NO_DATA_VALUE} in the raster"
@@ -2589,7 +2677,9 @@ class Dataset(AbstractDataset):
         gdf.set_crs(epsg=self.epsg, inplace=True)
         return gdf
 
-    def _set_no_data_value_backend(self, band_i: int, no_data_value: Any):
+    def _set_no_data_value_backend(
+        self, band_i: int, no_data_value: Any, fill: bool = True
+    ):
         """
             - band_i starts from 0 to the number of bands-1.
 
@@ -2599,6 +2689,8 @@ class Dataset(AbstractDataset):
             band index, starts from 0.
         no_data_value:
             Numerical value.
+        fill: [bool]
+            True to fill the band with the no_data_value. Default is True.
         """
         # check if the dtype of the no_data_value comply with the dtype of the raster itself.
         self._change_no_data_value_attr(band_i, no_data_value)
@@ -2606,7 +2698,8 @@ class Dataset(AbstractDataset):
         # the no_data_value may have changed inside the _change_no_data_value_attr method to float64, so redefine it.
         no_data_value = self.no_data_value[band_i]
         try:
-            self.raster.GetRasterBand(band_i + 1).Fill(no_data_value)
+            if fill:
+                self.raster.GetRasterBand(band_i + 1).Fill(no_data_value)
         except Exception as e:
             if str(e).__contains__(" argument 2 of type 'double'"):
                 self.raster.GetRasterBand(band_i + 1).Fill(np.float64(no_data_value))
@@ -2996,7 +3089,9 @@ class Dataset(AbstractDataset):
         gdf["id"] = gdf.index
         return gdf
 
-    def to_file(self, path: str, band: int = 0, tile_length: int = None) -> None:
+    def to_file(
+        self, path: str, band: int = 0, tile_length: int = None, cog: bool = False
+    ) -> None:
         """Save dataset to tiff file.
 
             `to_file` saves a raster to disk, the type of the driver (georiff/netcdf/ascii) will be implied from the
@@ -3008,8 +3103,13 @@ class Dataset(AbstractDataset):
             a path including the name of the dataset.
         band: [int]
             band index, needed only in case of ascii drivers. Default is 0.
-        tile_length: int, Optional, Default 256.
-            length of the tiles in the driver.
+        tile_length: int, Optional, Default None.
+            length of the tiles in the driver. If None, GeoTIFFs are written with the block size of the dataset, or
+            256 if the dataset has no block size.
+        cog: [bool], Optional, Default is False.
+            True to save a geotiff as a Cloud Optimized GeoTIFF (tiled, with internal overviews, ZSTD compressed, and
+            the blocks that contain only no data values are not written). The overviews are resampled using the
+            average for float data and the nearest neighbour otherwise.
 
         Examples
         --------
@@ -3032,7 +3132,7 @@ class Dataset(AbstractDataset):
         if not isinstance(path, str):
             raise TypeError("path input should be string type")
 
-        extension = path.split(".")[-1]
+        extension = os.path.splitext(path)[1][1:]
         driver = CATALOG.get_driver_name_by_extension(extension)
         driver_name = CATALOG.get_gdal_name(driver)
 
@@ -3041,6 +3141,35 @@ class Dataset(AbstractDataset):
             no_data_value = self.no_data_value[band]
             xmin, ymin, _, _ = self.bbox
             _io.to_ascii(arr, self.cell_size, xmin, ymin, no_data_value, path)
+        elif driver_name == "GTiff" and cog:
+            # the COG driver only supports CreateCopy, it builds the internal overviews from the source dataset
+            # (usually an in-memory dataset) while copying.
+            driver_name = "COG"
+            options = [
+                "COMPRESS=ZSTD",
+                "LEVEL=9",
+                "PREDICTOR=YES",
+                "NUM_THREADS=ALL_CPUS",
+                "SPARSE_OK=TRUE",
+                "BIGTIFF=IF_SAFER",
+                f"BLOCKSIZE={tile_length if tile_length is not None else 512}",
+                "OVERVIEWS=IGNORE_EXISTING",
+                "OVERVIEW_RESAMPLING={}".format(
+                    "AVERAGE" if self.dtype[0].startswith("float") else "NEAREST"
+                ),
+            ]
+        elif driver_name == "GTiff":
+            # the same compressed layout used to create new GeoTIFFs, with the given tile length, or the block size
+            # of the dataset.
+            if tile_length is not None:
+                block_size = tile_length
+            elif self._block_size is not None and self._block_size != []:
+                block_size = tuple(self._block_size[0])
+            else:
+                block_size = 256
+            options = Dataset._gtiff_creation_options(
+                self.gdal_dtype[0], block_size=block_size
+            )
         else:
             # saving rasters with color table fails with a runtime error
             options = ["COMPRESS=DEFLATE"]
@@ -3055,6 +3184,7 @@ class Dataset(AbstractDataset):
                     "BLOCKYSIZE={}".format(self._block_size[0][1]),
                 ]
 
+        if driver != "ascii":
             try:
                 dst = gdal.GetDriverByName(driver_name).CreateCopy(
                     path, self.raster, 0, options=options
@@ -3124,7 +3254,7 @@ class Dataset(AbstractDataset):
 
     def _band_to_polygon(self, band: int, col_name: str):
         band = self.raster.GetRasterBand(band + 1)
-        srs = osr.SpatialReference(wkt=self.crs)
+        srs = wkt_to_sr(self.crs)
 
         dst_ds = FeatureCollection.create_ds("memory")
         dst_layer = dst_ds.CreateLayer(col_name, srs=srs)
@@ -3285,31 +3415,27 @@ class Dataset(AbstractDataset):
             src = self
 
         if tile:
-            df_list = []  # DataFrames of each tile.
+            # fill one preallocated array with the cells of each tile, instead of creating a DataFrame for each tile
+            # and concatenating them.
+            pixels = np.empty(
+                (self.rows * self.columns, self.band_count), dtype=self.numpy_dtype[0]
+            )
+            offset = 0
             for arr in self.get_tile(tile_size):
-                # Assume multi-band
-                idx = (1, 2)
-                if arr.ndim == 2:
-                    # Handle single band rasters
-                    idx = (0, 1)
-
-                mask_arr = np.ones((arr.shape[idx[0]], arr.shape[idx[1]]))
-                pixels = get_pixels(arr, mask_arr).transpose()
-                df_list.append(pd.DataFrame(pixels, columns=band_names))
-
-            # Merge all the tiles.
-            df = pd.concat(df_list)
+                # all the cells of the tile are extracted, so flatten each band (as a view) instead of indexing the
+                # tile with a mask full of ones (single band tiles are 2D).
+                tile_pixels = arr.reshape(self.band_count, -1).transpose()
+                pixels[offset : offset + tile_pixels.shape[0]] = tile_pixels
+                offset += tile_pixels.shape[0]
+
+            df = pd.DataFrame(pixels, columns=band_names)
         else:
             arr = src.read_array()
 
             if self.band_count == 1:
-                pixels = arr.flatten()
+                pixels = arr.ravel()
             else:
-                pixels = (
-                    arr.flatten()
-                    .reshape(src.band_count, src.columns * src.rows)
-                    .transpose()
-                )
+                pixels = arr.reshape(src.band_count, src.columns * src.rows).transpose()
             df = pd.DataFrame(pixels, columns=band_names)
             # mask no data values.
             if src.no_data_value[0] is not None:
@@ -3381,7 +3507,7 @@ class Dataset(AbstractDataset):
         dtype = self.gdal_dtype[band]
 
         # fill the new array with the nodata value
-        new_array = np.ones((self.rows, self.columns)) * no_data_value
+        new_array = np.full((self.rows, self.columns), no_data_value, dtype=np.float64)
         # execute the function on each cell
         # TODO: optimize executing a function over a whole array
         for i in range(self.rows):
@@ -3545,7 +3671,8 @@ class Dataset(AbstractDataset):
 
         method = INTERPOLATION_METHODS.get(method)
 
-        sr_src = osr.SpatialReference(wkt=self.crs)
+        # read the projection once, it is used for the new dataset and both sides of the reprojection.
+        src_wkt = self.crs
 
         ulx = self.geotransform[0]
         uly = self.geotransform[3]
@@ -3572,7 +3699,7 @@ class Dataset(AbstractDataset):
         # set the geotransform
         dst.SetGeoTransform(new_geo)
         # set the projection
-        dst.SetProjection(sr_src.ExportToWkt())
+        dst.SetProjection(src_wkt)
         dst_obj = Dataset(dst, "write")
         # set the no data value
         dst_obj._set_no_data_value(self.no_data_value)
@@ -3580,8 +3707,8 @@ class Dataset(AbstractDataset):
         gdal.ReprojectImage(
             self.raster,
             dst_obj.raster,
-            sr_src.ExportToWkt(),
-            sr_src.ExportToWkt(),
+            src_wkt,
+            src_wkt,
             method,
         )
 
@@ -3594,7 +3721,8 @@ class Dataset(AbstractDataset):
         src_x = self.columns
         src_y = self.rows
 
-        src_sr = osr.SpatialReference(wkt=self.crs)
+        src_wkt = self.crs
+        src_sr = osr.SpatialReference(wkt=src_wkt)
         src_epsg = self.epsg
 
         dst_sr = self._create_sr_from_epsg(to_epsg)
@@ -3672,7 +3800,8 @@ class Dataset(AbstractDataset):
         # set the geotransform
         dst.SetGeoTransform(new_geo)
         # set the projection
-        dst.SetProjection(dst_sr.ExportToWkt())
+        dst_wkt = dst_sr.ExportToWkt()
+        dst.SetProjection(dst_wkt)
         # set the no data value
         dst_obj = Dataset(dst)
         dst_obj._set_no_data_value(self.no_data_value)
@@ -3680,8 +3809,8 @@ class Dataset(AbstractDataset):
         gdal.ReprojectImage(
             self.raster,
             dst_obj.raster,
-            src_sr.ExportToWkt(),
-            dst_sr.ExportToWkt(),
+            src_wkt,
+            dst_wkt,
             method,
         )
         return dst_obj
@@ -3796,7 +3925,6 @@ class Dataset(AbstractDataset):
             )
 
         band_count = self.band_count
-        src_sref = osr.SpatialReference(wkt=self.crs)
         src_array = self.read_array()
 
         if not row == self.rows or not col == self.columns:
@@ -3857,11 +3985,11 @@ class Dataset(AbstractDataset):
             dst.SetProjection(mask.crs)
         except UnboundLocalError:
             dst.SetGeoTransform(self.geotransform)
-            dst.SetProjection(src_sref.ExportToWkt())
+            dst.SetProjection(self.crs)
 
         dst_obj = Dataset(dst)
         # set the no data value
-        dst_obj._set_no_data_value(self.no_data_value)
+        dst_obj._set_no_data_value(self.no_data_value, fill=False)
         if band_count > 1:
             for band in range(band_count):
                 dst_obj.raster.GetRasterBand(band + 1).WriteArray(src_array[band, :, :])
@@ -4659,18 +4787,22 @@ class Dataset(AbstractDataset):
             if exclude_value is not None
             else [no_data_value]
         )
-        ind = get_indices2(arr, mask)
+        ind = np.asarray(get_indices2(arr, mask), dtype=np.int64).reshape(-1, 2)
         classes = classes_map.read_array()
-        values = dict()
-
-        # extract values
-        for i, ind_i in enumerate(ind):
-            # first check if the sub-basin has a list in the dict if not create a list
-            key = classes[ind_i[0], ind_i[1]]
-            if key not in list(values.keys()):
-                values[key] = list()
-
-            values[key].append(arr[ind_i[0], ind_i[1]])
+        keys = classes[ind[:, 0], ind[:, 1]]
+        cell_values = arr[ind[:, 0], ind[:, 1]]
+
+        # group the cells by class with one sort, then slice each class from the sorted values instead of looking
+        # up the dict for every cell.
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        cell_values = cell_values[order]
+        class_values, starts = np.unique(keys, return_index=True)
+        ends = np.append(starts[1:], len(keys))
+        values = {
+            key: list(cell_values[start:end])
+            for key, start, end in zip(class_values, starts, ends)
+        }
 
         return values
 
@@ -4933,169 +5065,6 @@ class Dataset(AbstractDataset):
                 xoff=xoff, yoff=yoff, xsize=xsize, ysize=ysize
             )
 
-    @staticmethod
-    def _group_neighbours(
-        array, i, j, lower_bound, upper_bound, position, values, count, cluster
-    ):
-        """Group neighboring cells with the same values."""
-        # bottom cell
-        if i + 1 < array.shape[0]:
-            if lower_bound <= array[i + 1, j] <= upper_bound and cluster[i + 1, j] == 0:
-                position.append([i + 1, j])
-                values.append(array[i + 1, j])
-                cluster[i + 1, j] = count
-                Dataset._group_neighbours(
-                    array,
-                    i + 1,
-                    j,
-                    lower_bound,
-                    upper_bound,
-                    position,
-                    values,
-                    count,
-                    cluster,
-                )
-
-        # bottom right
-        if j + 1 < array.shape[1]:
-            if i + 1 < array.shape[0]:
-                if (
-                    lower_bound <= array[i + 1, j + 1] <= upper_bound
-                    and cluster[i + 1, j + 1] == 0
-                ):
-                    position.append([i + 1, j + 1])
-                    values.append(array[i + 1, j + 1])
-                    cluster[i + 1, j + 1] = count
-                    Dataset._group_neighbours(
-                        array,
-                        i + 1,
-                        j + 1,
-                        lower_bound,
-                        upper_bound,
-                        position,
-                        values,
-                        count,
-                        cluster,
-                    )
-
-        # right
-        if j + 1 < array.shape[1]:
-            if lower_bound <= array[i, j + 1] <= upper_bound and cluster[i, j + 1] == 0:
-                position.append([i, j + 1])
-                values.append(array[i, j + 1])
-                cluster[i, j + 1] = count
-                Dataset._group_neighbours(
-                    array,
-                    i,
-                    j + 1,
-                    lower_bound,
-                    upper_bound,
-                    position,
-                    values,
-                    count,
-                    cluster,
-                )
-
-        # upper right
-        if j + 1 < array.shape[1]:
-            if i - 1 >= 0:
-                if (
-                    lower_bound <= array[i - 1, j + 1] <= upper_bound
-                    and cluster[i - 1, j + 1] == 0
-                ):
-                    position.append([i - 1, j + 1])
-                    values.append(array[i - 1, j + 1])
-                    cluster[i - 1, j + 1] = count
-                    Dataset._group_neighbours(
-                        array,
-                        i - 1,
-                        j + 1,
-                        lower_bound,
-                        upper_bound,
-                        position,
-                        values,
-                        count,
-                        cluster,
-                    )
-        # top
-        if i - 1 >= 0:
-            if lower_bound <= array[i - 1, j] <= upper_bound and cluster[i - 1, j] == 0:
-                position.append([i - 1, j])
-                values.append(array[i - 1, j])
-                cluster[i - 1, j] = count
-                Dataset._group_neighbours(
-                    array,
-                    i - 1,
-                    j,
-                    lower_bound,
-                    upper_bound,
-                    position,
-                    values,
-                    count,
-                    cluster,
-                )
-
-        # top left
-        if i - 1 >= 0:
-            if j - 1 >= 0:
-                if (
-                    lower_bound <= array[i - 1, j - 1] <= upper_bound
-                    and cluster[i - 1, j - 1] == 0
-                ):
-                    position.append([i - 1, j - 1])
-                    values.append(array[i - 1, j - 1])
-                    cluster[i - 1, j - 1] = count
-                    Dataset._group_neighbours(
-                        array,
-                        i - 1,
-                        j - 1,
-                        lower_bound,
-                        upper_bound,
-                        position,
-                        values,
-                        count,
-                        cluster,
-                    )
-        # left
-        if j - 1 >= 0:
-            if lower_bound <= array[i, j - 1] <= upper_bound and cluster[i, j - 1] == 0:
-                position.append([i, j - 1])
-                values.append(array[i, j - 1])
-                cluster[i, j - 1] = count
-                Dataset._group_neighbours(
-                    array,
-                    i,
-                    j - 1,
-                    lower_bound,
-                    upper_bound,
-                    position,
-                    values,
-                    count,
-                    cluster,
-                )
-
-        # bottom left
-        if j - 1 >= 0:
-            if i + 1 < array.shape[0]:
-                if (
-                    lower_bound <= array[i + 1, j - 1] <= upper_bound
-                    and cluster[i + 1, j - 1] == 0
-                ):
-                    position.append([i + 1, j - 1])
-                    values.append(array[i + 1, j - 1])
-                    cluster[i + 1, j - 1] = count
-                    Dataset._group_neighbours(
-                        array,
-                        i + 1,
-                        j - 1,
-                        lower_bound,
-                        upper_bound,
-                        position,
-                        values,
-                        count,
-                        cluster,
-                    )
-
     def cluster(
         self, lower_bound: Any, upper_bound: Any
     ) -> Tuple[np.ndarray, int, list, list]:
@@ -5154,11 +5123,11 @@ class Dataset(AbstractDataset):
             and 0 is outside.
 
             >>> print(cluster_array)  # doctest: +SKIP
-            [[1. 1. 1. 1. 1.]
-             [1. 1. 0. 0. 0.]
-             [0. 1. 1. 1. 1.]
-             [1. 0. 0. 1. 1.]
-             [1. 1. 1. 1. 1.]]
+            [[1 1 1 1 1]
+             [1 1 0 0 0]
+             [0 1 1 1 1]
+             [1 0 0 1 1]
+             [1 1 1 1 1]]
 
         - The second returned value is the number of connected clusters.
 
@@ -5168,39 +5137,38 @@ class Dataset(AbstractDataset):
         - The third returned value is the indices of the cells that belongs to the cluster.
 
             >>> print(position) # doctest: +SKIP
-            [[1, 0], [2, 1], [2, 2], [3, 3], [4, 3], [4, 4], [3, 4], [2, 4], [2, 3], [4, 2], [4, 1], [3, 0], [4, 0], [1, 1], [0, 2], [0, 3], [0, 4], [0, 1], [0, 0]]
+            [[0, 0], [0, 1], [0, 2], [0, 3], [0, 4], [1, 0], [1, 1], [2, 1], [2, 2], [2, 3], [2, 4], [3, 0], [3, 3], [3, 4], [4, 0], [4, 1], [4, 2], [4, 3], [4, 4]]
 
         - The fourth returned value is a list of the values that are in the cluster (extracted from these cells).
 
             >>> print(values) # doctest: +SKIP
-            [3, 3, 3, 3, 3, 2, 2, 2, 2, 2, 4, 4, 2, 4, 3, 2, 3, 3, 2]
+            [2, 3, 3, 2, 3, 3, 4, 3, 3, 2, 2, 4, 3, 2, 2, 4, 2, 3, 2]
 
         """
         data = self.read_array()
-        position = []
-        values = []
-        count = 1
-        cluster = np.zeros(shape=(data.shape[0], data.shape[1]))
-
-        for i in range(data.shape[0]):
-            for j in range(data.shape[1]):
-                if lower_bound <= data[i, j] <= upper_bound and cluster[i, j] == 0:
-                    self._group_neighbours(
-                        data,
-                        i,
-                        j,
-                        lower_bound,
-                        upper_bound,
-                        position,
-                        values,
-                        count,
-                        cluster,
-                    )
-                    if cluster[i, j] == 0:
-                        position.append([i, j])
-                        values.append(data[i, j])
-                        cluster[i, j] = count
-                    count += 1
+        # build the mask in preallocated boolean buffers to avoid a temporary array for each comparison.
+        mask = np.empty(data.shape, dtype=bool)
+        buffer = np.empty(data.shape, dtype=bool)
+        np.greater_equal(data, lower_bound, out=mask)
+        np.less_equal(data, upper_bound, out=buffer)
+        np.logical_and(mask, buffer, out=mask)
+        no_data_value = self.no_data_value[0]
+        if no_data_value is not None:
+            np.not_equal(data, no_data_value, out=buffer)
+            np.logical_and(mask, buffer, out=mask)
+
+        # label the connected cells (including the diagonal neighbours) in one pass.
+        cluster, cluster_count = ndimage.label(
+            mask, structure=np.ones((3, 3), dtype=bool)
+        )
+        # group the indices of the cells by their cluster number (cells of each cluster are in row-major order).
+        rows, cols = np.nonzero(cluster)
+        order = np.argsort(cluster[rows, cols], kind="stable")
+        rows, cols = rows[order], cols[order]
+        position = np.column_stack((rows, cols)).tolist()
+        values = data[rows, cols].tolist()
+        # the count is the number of clusters + 1 (the same as the next cluster number).
+        count = int(cluster_count) + 1
 
         return cluster, count, position, values
 
@@ -5601,7 +5569,7 @@ class Dataset(AbstractDataset):
                 )
             # read the array from the first overview to get the size of the array.
             arr = self.get_overview(0, 0).ReadAsArray()
-            arr = np.ones(
+            arr = np.empty(
                 (
                     self.band_count,
                     arr.shape[0],
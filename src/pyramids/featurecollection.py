@@ -8,7 +8,6 @@ drivers available in geopandas
 gpd.io.file._EXTENSION_TO_DRIVER
 """
 
-import json
 import os
 import shutil
 import tempfile
@@ -312,10 +311,8 @@ class FeatureCollection:
         ogr.DataSource
         """
         if isinstance(self.feature, GeoDataFrame):
-            gdf_json = json.loads(self.feature.to_json())
-            geojson_str = json.dumps(gdf_json)
             # Use the /vsimem/ (Virtual File Systems) to write the GeoJSON string to memory
-            gdal.FileFromMemBuffer(MEMORY_FILE, geojson_str)
+            gdal.FileFromMemBuffer(MEMORY_FILE, self.feature.to_json())
             # Use OGR to open the GeoJSON from memory
             if not gdal_dataset:
                 drv = ogr.GetDriverByName("GeoJSON")
@@ -522,22 +519,29 @@ class FeatureCollection:
         )
 
         bands = list(range(1, bands_count + 1))
-        # loop over bands
-        for ind, band in enumerate(bands):
-            rasterize_opts = gdal.RasterizeOptions(
-                bands=[band],
-                burnValues=burn_values,
-                attribute=attribute[ind] if isinstance(attribute, list) else attribute,
-                allTouched=True,
-            )
-            # if the second parameter to the Rasterize function is str, it will be read using gdal.OpenEX inside the
-            # function, so if the second parameter is not str, it should be a dataset, if you try to use ogr.DataSource
-            # it will give an error.
-            # the second parameter can be given as a path, or read the vector using gdal.OpenEX and use it as a
-            # second parameter.
-            _ = gdal.Rasterize(
-                dataset_n.raster, vector_gdal_ex.feature, options=rasterize_opts
-            )
+        try:
+            # loop over bands
+            for ind, band in enumerate(bands):
+                rasterize_opts = gdal.RasterizeOptions(
+                    bands=[band],
+                    burnValues=burn_values,
+                    attribute=(
+                        attribute[ind] if isinstance(attribute, list) else attribute
+                    ),
+                    allTouched=True,
+                )
+                # if the second parameter to the Rasterize function is str, it will be read using gdal.OpenEX inside the
+                # function, so if the second parameter is not str, it should be a dataset, if you try to use ogr.DataSource
+                # it will give an error.
+                # the second parameter can be given as a path, or read the vector using gdal.OpenEX and use it as a
+                # second parameter.
+                _ = gdal.Rasterize(
+                    dataset_n.raster, vector_gdal_ex.feature, options=rasterize_opts
+                )
+        finally:
+            # only a GeoDataFrame is written to the in-memory GeoJSON buffer, release it once the vector is burned.
+            if isinstance(self.feature, GeoDataFrame):
+                gdal.Unlink(MEMORY_FILE)
 
         return dataset_n
 
@@ -258,8 +258,8 @@ class NetCDF(Dataset):
         rg = self._raster.GetRootGroup()
         if rg is not None:
             variable_names = rg.GetMDArrayNames()
-            dims = rg.GetDimensions()
-            dims = [dim.GetName() for dim in dims]
+            # skip the coordinate (dimension) variables in one pass over the names.
+            dims = {dim.GetName() for dim in rg.GetDimensions()}
             variable_names = [var for var in variable_names if var not in dims]
         else:
             variable_names = [
@@ -69,6 +69,18 @@ class TestConfigMock(unittest.TestCase):
         # self.assertEqual(os.environ["GDAL_DRIVER_PATH"], "/usr/lib/gdalplugins")
         mock_register.assert_called_once()
 
+    @patch("os.environ", new={"GDAL_CACHEMAX": "256"})
+    @patch("pyramids.config.Config.dynamic_env_variables", return_value=None)
+    @patch("osgeo.gdal.AllRegister")
+    @patch("osgeo.gdal.SetConfigOption")
+    def test_initialize_gdal_keeps_environment_variables(
+        self, mock_set_config, mock_register, mock_dynamic
+    ):
+        self.config.initialize_gdal()
+        keys = [call.args[0] for call in mock_set_config.call_args_list]
+        self.assertNotIn("GDAL_CACHEMAX", keys)
+        self.assertIn("VSI_CACHE", keys)
+
     @patch("os.getenv", return_value=None)
     @patch("pathlib.Path.exists", return_value=False)
     def test_set_env_conda_no_conda(self, mock_exists, mock_getenv):
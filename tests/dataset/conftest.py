@@ -11,6 +11,8 @@ from osgeo import gdal
 from osgeo.gdal import Dataset
 from shapely import wkt
 
+from pyramids.datacube import Datacube
+
 
 @pytest.fixture(scope="module")
 def src_path() -> str:
@@ -312,6 +314,18 @@ def rasters_folder_path() -> str:
     return "tests/data/geotiff/raster-folder"
 
 
+@pytest.fixture(scope="module")
+def rasters_folder_cube(rasters_folder_path: str) -> Datacube:
+    """Datacube of the rasters folder with the values read.
+
+    the cube is read once and shared between the tests of the module, tests that change the cube (in place
+    operations or setting values) have to read their own cube.
+    """
+    cube = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
+    cube.open_datacube()
+    return cube
+
+
 @pytest.fixture(scope="module")
 def rhine_raster(rasters_folder_path: str) -> Dataset:
     return gdal.Open(f"{rasters_folder_path}/MSWEP_1979.01.02.tif")
@@ -347,11 +361,6 @@ def rasters_folder_date_fmt() -> str:
     return "%Y-%m-%d"
 
 
-@pytest.fixture(scope="module")
-def rasters_folder_between_dates_raster_number() -> int:
-    return 4
-
-
 @pytest.fixture(scope="module")
 def polygon_mask() -> gpd.GeoDataFrame:
     return gpd.read_file("tests/data/polygon_germany.geojson")
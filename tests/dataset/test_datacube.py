@@ -6,6 +6,7 @@ from typing import List
 
 import geopandas as gpd
 import numpy as np
+import pytest
 from osgeo import gdal
 
 from pyramids.dataset import Dataset
@@ -13,80 +14,61 @@ from pyramids.datacube import Datacube
 
 
 class TestCreateDataCube:
-    def test_read_all_without_order(
+    @pytest.mark.parametrize(
+        "path, kwargs, expected_count",
+        [
+            ("tests/data/geotiff/raster-folder", {"with_order": False}, 6),
+            (
+                "tests/data/geotiff/raster-folder",
+                {"with_order": True, "file_name_data_fmt": "%Y.%m.%d"},
+                6,
+            ),
+            (
+                "tests/data/geotiff/raster-folder",
+                {
+                    "with_order": True,
+                    "file_name_data_fmt": "%Y.%m.%d",
+                    "start": "1979-01-02",
+                    "end": "1979-01-05",
+                    "fmt": "%Y-%m-%d",
+                },
+                4,
+            ),
+            (
+                "tests/data/geotiff/rhine",
+                {"with_order": True, "regex_string": r"\d+", "date": False},
+                3,
+            ),
+            (
+                "tests/data/ascii/ascii-folder",
+                {"with_order": False, "extension": ".asc"},
+                6,
+            ),
+        ],
+        ids=[
+            "without_order",
+            "with_order_date",
+            "between_dates",
+            "with_order_numbers",
+            "ascii_without_order",
+        ],
+    )
+    def test_read(
         self,
-        rasters_folder_path: str,
-        rasters_folder_rasters_number: int,
-        rasters_folder_dim: tuple,
-    ):
-        dataset = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-        assert isinstance(dataset.base, Dataset)
-        assert dataset.base.no_data_value[0] == 2147483648.0
-        assert isinstance(dataset.files, list)
-        assert dataset.time_length == rasters_folder_rasters_number
-        assert dataset.base.rows == rasters_folder_dim[0]
-        assert dataset.base.columns == rasters_folder_dim[1]
-
-    def test_read_all_with_order_date(
-        self,
-        rasters_folder_path: str,
-        rasters_folder_rasters_number: int,
         rasters_folder_dim: tuple,
+        path: str,
+        kwargs: dict,
+        expected_count: int,
     ):
-        dataset = Datacube.read_multiple_files(
-            rasters_folder_path,
-            with_order=True,
-            file_name_data_fmt="%Y.%m.%d",
-        )
-        assert isinstance(dataset.base, Dataset)
-        assert dataset.base.no_data_value[0] == 2147483648.0
-        assert isinstance(dataset.files, list)
-        assert dataset.time_length == rasters_folder_rasters_number
-        assert dataset.base.rows == rasters_folder_dim[0]
-        assert dataset.base.columns == rasters_folder_dim[1]
-
-    def test_read_between_dates(
-        self,
-        rasters_folder_path: str,
-        rasters_folder_start_date: str,
-        rasters_folder_end_date: str,
-        rasters_folder_date_fmt: str,
-        rasters_folder_dim: tuple,
-        rasters_folder_between_dates_raster_number: int,
-    ):
-        dataset = Datacube.read_multiple_files(
-            rasters_folder_path,
-            with_order=True,
-            file_name_data_fmt="%Y.%m.%d",
-            start=rasters_folder_start_date,
-            end=rasters_folder_end_date,
-            fmt=rasters_folder_date_fmt,
-        )
+        dataset = Datacube.read_multiple_files(path, **kwargs)
         assert isinstance(dataset.base, Dataset)
         assert dataset.base.no_data_value[0] == 2147483648.0
         assert isinstance(dataset.files, list)
-        assert dataset.time_length == rasters_folder_between_dates_raster_number
-        assert dataset.base.rows == rasters_folder_dim[0]
-        assert dataset.base.columns == rasters_folder_dim[1]
-
-    def test_read_all_with_order_numbers(
-        self,
-        rasters_folder_path: str,
-        rasters_folder_rasters_number: int,
-        rasters_folder_dim: tuple,
-    ):
-        dataset = Datacube.read_multiple_files(
-            "tests/data/geotiff/rhine",
-            with_order=True,
-            regex_string=r"\d+",
-            date=False,
-        )
-        assert isinstance(dataset.base, Dataset)
-        assert dataset.base.no_data_value[0] == 2147483648.0
-        assert isinstance(dataset.files, list)
-        assert dataset.time_length == 3
+        assert dataset.time_length == expected_count
         assert dataset.base.rows == rasters_folder_dim[0]
         assert dataset.base.columns == rasters_folder_dim[1]
+        # the shape is known without reading the values.
+        assert dataset.shape == (expected_count, *rasters_folder_dim)
 
     def test_read_with_order_error(
         self,
@@ -109,24 +91,6 @@ class TestCreateDataCube:
             pass
 
 
-class TestAscii:
-    def test_read_all_without_order(
-        self,
-        ascii_folder_path: str,
-        rasters_folder_rasters_number: int,
-        rasters_folder_dim: tuple,
-    ):
-        dataset = Datacube.read_multiple_files(
-            ascii_folder_path, with_order=False, extension=".asc"
-        )
-        assert isinstance(dataset.base, Dataset)
-        assert dataset.base.no_data_value[0] == 2147483648.0
-        assert isinstance(dataset.files, list)
-        assert dataset.time_length == rasters_folder_rasters_number
-        assert dataset.base.rows == rasters_folder_dim[0]
-        assert dataset.base.columns == rasters_folder_dim[1]
-
-
 class TestOpenDataCube:
     def test_geotiff(
         self,
@@ -141,6 +105,8 @@ class TestOpenDataCube:
             rasters_folder_dim[0],
             rasters_folder_dim[1],
         )
+        # the float32 files are not upcast to float64.
+        assert dataset.values.dtype == np.float32
 
     def test_ascii(
         self,
@@ -158,16 +124,49 @@ class TestOpenDataCube:
             rasters_folder_dim[1],
         )
 
+    def test_ascii_with_workers(
+        self,
+        ascii_folder_path: str,
+        rasters_folder_rasters_number: int,
+        rasters_folder_dim: tuple,
+    ):
+        dataset = Datacube.read_multiple_files(
+            ascii_folder_path, with_order=False, extension=".asc"
+        )
+        dataset.open_datacube(workers=3)
+        assert dataset.values.shape == (
+            rasters_folder_rasters_number,
+            rasters_folder_dim[0],
+            rasters_folder_dim[1],
+        )
+        arr = gdal.Open(dataset.files[2]).ReadAsArray()
+        np.testing.assert_array_equal(dataset.values[2, :, :], arr)
+
+    def test_file_with_different_dimensions(
+        self,
+        rasters_folder_path: str,
+        src_path: str,
+    ):
+        files = [
+            os.path.join(rasters_folder_path, i)
+            for i in sorted(os.listdir(rasters_folder_path))
+            if i.endswith(".tif")
+        ]
+        dataset = Datacube.read_multiple_files(files + [src_path])
+        with pytest.raises(ValueError):
+            dataset.open_datacube()
+        with pytest.raises(ValueError):
+            dataset.open_datacube(workers=3)
+
 
 class TestAccessDataset:
     def test_iloc(
         self,
-        rasters_folder_path: str,
+        rasters_folder_cube: Datacube,
         rasters_folder_rasters_number: int,
         rasters_folder_dim: tuple,
     ):
-        dataset = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-        dataset.open_datacube()
+        dataset = rasters_folder_cube
         src = dataset.iloc(2)
         assert isinstance(src, Dataset)
         arr = src.read_array()
@@ -208,7 +207,7 @@ class TestAlign:
 class TestSaveDatacube:
     def test_to_geotiff_with_path(
         self,
-        rasters_folder_path: str,
+        rasters_folder_cube: Datacube,
         rasters_folder_rasters_number: int,
         rasters_folder_dim: tuple,
     ):
@@ -216,8 +215,7 @@ class TestSaveDatacube:
         if os.path.exists(path):
             shutil.rmtree(path)
 
-        cube = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-        cube.open_datacube()
+        cube = rasters_folder_cube
         cube.to_file(path)
         files = os.listdir(path)
         assert len(files) == 6
@@ -225,7 +223,7 @@ class TestSaveDatacube:
 
     def test_to_geotiff_with_list_of_paths(
         self,
-        rasters_folder_path: str,
+        rasters_folder_cube: Datacube,
         rasters_folder_rasters_number: int,
         rasters_folder_dim: tuple,
     ):
@@ -233,17 +231,32 @@ class TestSaveDatacube:
         if os.path.exists(rpath):
             shutil.rmtree(rpath)
 
-        cube = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-        cube.open_datacube()
+        cube = rasters_folder_cube
         path = [f"{rpath}/{i}.tif" for i in range(cube.time_length)]
         cube.to_file(path)
         files = os.listdir(rpath)
         assert len(files) == 6
         shutil.rmtree(rpath)
 
+    def test_to_geotiff_with_workers(
+        self,
+        rasters_folder_cube: Datacube,
+    ):
+        path = "tests/data/dataset/save_geotiff_workers"
+        if os.path.exists(path):
+            shutil.rmtree(path)
+
+        cube = rasters_folder_cube
+        cube.to_file(path, workers=3)
+        files = os.listdir(path)
+        assert len(files) == 6
+        src = Dataset.read_file(f"{path}/2.tif")
+        assert np.array_equal(src.read_array(), cube.values[2, :, :])
+        shutil.rmtree(path)
+
     def test_to_ascii(
         self,
-        rasters_folder_path: str,
+        rasters_folder_cube: Datacube,
         rasters_folder_rasters_number: int,
         rasters_folder_dim: tuple,
     ):
@@ -251,8 +264,7 @@ class TestSaveDatacube:
         if os.path.exists(path):
             shutil.rmtree(path)
 
-        cube = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-        cube.open_datacube()
+        cube = rasters_folder_cube
         cube.to_file(path, driver="ascii", band=0)
         files = os.listdir(path)
         assert len(files) == 6
@@ -286,7 +298,7 @@ class TestCrop:
     def test_crop_with_raster_inplace_false(
         self,
         raster_mask: Datacube,
-        rasters_folder_path: str,
+        rasters_folder_cube: Datacube,
         crop_aligned_folder_saveto: str,
     ):
         # if os.path.exists(crop_aligned_folder_saveto):
@@ -296,8 +308,7 @@ class TestCrop:
         #     os.mkdir(crop_aligned_folder_saveto)
 
         mask = Dataset(raster_mask)
-        cube = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-        cube.open_datacube()
+        cube = rasters_folder_cube
         cropped_dataset = cube.crop(mask, inplace=False)
         # cube.to_geotiff(crop_aligned_folder_saveto)_crop_with_polygon
         arr = cropped_dataset.values[0, :, :]
@@ -337,6 +348,60 @@ def test_merge(
     assert os.path.exists(merge_output)
     src = gdal.Open(merge_output)
     assert src.GetRasterBand(1).GetNoDataValue() == 0
+    # the rasters overlap, the output covers the union of their extents with the cell size of the first raster.
+    geo = gdal.Open(merge_input_raster[0]).GetGeoTransform()
+    assert (src.RasterYSize, src.RasterXSize) == (5, 7)
+    assert src.GetGeoTransform()[0] == pytest.approx(-92.03658482384117)
+    assert src.GetGeoTransform()[3] == pytest.approx(41.280885729317774)
+    assert src.GetGeoTransform()[1] == pytest.approx(geo[1])
+    # the overlapping cells have the values of the input rasters.
+    arr = src.ReadAsArray()
+    for path in merge_input_raster:
+        raster = gdal.Open(path)
+        row, column = _merge_offset(src, raster)
+        np.testing.assert_array_equal(
+            arr[row : row + raster.RasterYSize, column : column + raster.RasterXSize],
+            raster.ReadAsArray(),
+        )
+
+
+def test_merge_with_gap(merge_input_raster: List[str]):
+    # two rasters at the opposite corners of the extent, the cells between them are not covered by any raster.
+    src = [
+        path
+        for path in merge_input_raster
+        if os.path.basename(path)
+        in ["splitted-raster0-0.tif", "splitted-raster3-3.tif"]
+    ]
+    dst = "tests/data/geotiff/merge/merged-raster-with-gap-delete.tif"
+    Datacube.merge(src, dst)
+    merged = gdal.Open(dst)
+    assert (merged.RasterYSize, merged.RasterXSize) == (5, 7)
+    arr = merged.ReadAsArray()
+    covered = np.zeros(arr.shape, dtype=bool)
+    for path in src:
+        raster = gdal.Open(path)
+        row, column = _merge_offset(merged, raster)
+        window = (
+            slice(row, row + raster.RasterYSize),
+            slice(column, column + raster.RasterXSize),
+        )
+        np.testing.assert_array_equal(arr[window], raster.ReadAsArray())
+        covered[window] = True
+    # the cells that are not covered are filled with the no data value.
+    assert not covered.all()
+    assert np.all(arr[~covered] == merged.GetRasterBand(1).GetNoDataValue())
+    merged = None
+    os.remove(dst)
+
+
+def _merge_offset(merged: gdal.Dataset, raster: gdal.Dataset):
+    """Row and column of the top left corner of the raster in the merged raster."""
+    merged_geo = merged.GetGeoTransform()
+    geo = raster.GetGeoTransform()
+    row = round((merged_geo[3] - geo[3]) / abs(merged_geo[5]))
+    column = round((geo[0] - merged_geo[0]) / merged_geo[1])
+    return row, column
 
 
 class TestApply:
@@ -350,9 +415,8 @@ class TestApply:
         cube.apply(func)
 
 
-def test_overlay(rasters_folder_path: str, germany_classes: str):
-    cube = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-    cube.open_datacube()
+def test_overlay(rasters_folder_cube: Datacube, germany_classes: str):
+    cube = rasters_folder_cube
 
     classes_src = Dataset.read_file(germany_classes)
     class_dict = cube.overlay(classes_src)
@@ -367,11 +431,10 @@ def test_overlay(rasters_folder_path: str, germany_classes: str):
 class TestProperties:
     def test_getitem(
         self,
-        rasters_folder_path: str,
+        rasters_folder_cube: Datacube,
         rasters_folder_dim: tuple,
     ):
-        cube = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-        cube.open_datacube()
+        cube = rasters_folder_cube
         arr = cube[2]
         assert arr.shape == (
             rasters_folder_dim[0],
@@ -395,28 +458,25 @@ class TestProperties:
 
     def test_len(
         self,
-        rasters_folder_path: str,
+        rasters_folder_cube: Datacube,
         rasters_folder_rasters_number: int,
     ):
-        cube = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-        cube.open_datacube()
+        cube = rasters_folder_cube
         assert len(cube) == rasters_folder_rasters_number
 
     def test_iter(
         self,
-        rasters_folder_path: str,
+        rasters_folder_cube: Datacube,
         rasters_folder_rasters_number: int,
     ):
-        cube = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-        cube.open_datacube()
+        cube = rasters_folder_cube
         assert len(list(cube)) == rasters_folder_rasters_number
 
     def test_head_tail(
         self,
-        rasters_folder_path: str,
+        rasters_folder_cube: Datacube,
     ):
-        cube = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-        cube.open_datacube()
+        cube = rasters_folder_cube
         head = cube.head()
         tail = cube.tail()
         assert head.shape[0] == 5
@@ -424,11 +484,10 @@ class TestProperties:
 
     def test_first_last(
         self,
-        rasters_folder_path: str,
+        rasters_folder_cube: Datacube,
         rasters_folder_dim: tuple,
     ):
-        cube = Datacube.read_multiple_files(rasters_folder_path, with_order=False)
-        cube.open_datacube()
+        cube = rasters_folder_cube
         first = cube.first()
         last = cube.last()
         assert first.shape == rasters_folder_dim
@@ -60,6 +60,24 @@ class TestCreateRasterObject:
         )
         assert src.raster.GetGeoTransform() == src_geotransform
 
+    def test_create_from_array_to_disk(self, src_epsg: int):
+        # more rows than one row of tiles, and a last row of tiles that is not complete.
+        arr = np.random.rand(2, 600, 300)
+        path = "tests/data/geotiff/create-from-array-multi-band-delete.tif"
+        src = Dataset.create_from_array(
+            arr=arr,
+            top_left_corner=(0, 0),
+            cell_size=0.05,
+            epsg=src_epsg,
+            no_data_value=-9999,
+            path=path,
+        )
+        src.close()
+        dst = Dataset.read_file(path)
+        np.testing.assert_allclose(dst.read_array(), arr)
+        dst.close()
+        os.remove(path)
+
     def test_create(self):
         cell_size = 4000
         rows = 13
@@ -446,6 +464,33 @@ class TestSpatialProperties:
         arr = src.read_array()
         assert np.array_equal(multi_band.ReadAsArray(), arr)
 
+    def test_read_array_into_memmap(
+        self,
+        multi_band: gdal.Dataset,
+    ):
+        src = Dataset(multi_band)
+        path = "tests/data/read-array-memmap-delete.dat"
+        out = np.memmap(
+            path,
+            dtype=src.numpy_dtype[0],
+            mode="w+",
+            shape=(src.band_count, src.rows, src.columns),
+        )
+        arr = src.read_array(out=out)
+        assert arr is out
+        assert np.array_equal(multi_band.ReadAsArray(), np.asarray(out))
+        del arr, out
+        os.remove(path)
+
+    def test_read_array_into_wrong_shape(
+        self,
+        multi_band: gdal.Dataset,
+    ):
+        src = Dataset(multi_band)
+        out = np.empty((src.rows, src.columns), dtype=src.numpy_dtype[0])
+        with pytest.raises(ValueError):
+            src.read_array(out=out)
+
     def test_read_block_with_list_window(
         self,
         src: Dataset,
@@ -713,6 +758,23 @@ class TestSave:
         assert os.path.exists(ascii_file_save_to)
         os.remove(ascii_file_save_to)
 
+    def test_save_cog(
+        self,
+        src: gdal.Dataset,
+    ):
+        path = "tests/data/save_cog_test.tif"
+        if os.path.exists(path):
+            os.remove(path)
+        src = Dataset(src)
+        arr = src.read_array()
+        src.to_file(path, cog=True)
+        assert os.path.exists(path)
+        dst = gdal.Open(path)
+        assert dst.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") == "COG"
+        np.testing.assert_array_equal(dst.ReadAsArray(), arr)
+        src = dst = None
+        os.remove(path)
+
 
 class TestMathOperations:
     def test_apply(
@@ -1612,6 +1674,17 @@ class TestClustering:
         assert len(position) == 2364
         assert len(values) == 2364
 
+    def test_exclude_no_data_value(self):
+        arr = np.array([[2, 2, 1], [1, 1, 1], [1, 3, 3]], dtype=np.float32)
+        dataset = Dataset.create_from_array(
+            arr, top_left_corner=(0, 0), cell_size=0.05, epsg=4326, no_data_value=3
+        )
+        cluster_array, count, position, values = dataset.cluster(2, 4)
+        assert count == 2
+        assert position == [[0, 0], [0, 1]]
+        assert values == [2, 2]
+        assert cluster_array[2, 1] == 0
+
 
 class TestNCtoGeoTIFF:
     def test_convert_0_360_to_180_180_longitude_new_dataset(self, noah: gdal.Dataset):
@@ -1,3 +1,5 @@
+import datetime as dt
+
 import numpy as np
 import pytest
 from osgeo import gdal, ogr
@@ -12,6 +14,9 @@ from pyramids._utils import (
     ogr_to_numpy_dtype,
     color_name_to_gdal_constant,
     gdal_constant_to_color_name,
+    create_time_conversion_func,
+    epsg_to_wkt,
+    wkt_to_sr,
 )
 
 
@@ -44,6 +49,8 @@ def test_gdal_to_ogr_dtype(test_image: gdal.Dataset, src: gdal.Dataset):
 
 def test_ogr_to_numpy_dtype():
     assert ogr_to_numpy_dtype(0) == np.int32
+    assert ogr_to_numpy_dtype(12) == np.int64
+    assert ogr_to_numpy_dtype(2) == np.float64
     try:
         ogr_to_numpy_dtype(1)
     except ValueError:
@@ -55,6 +62,10 @@ class TestCatalog:
         catalog = Catalog()
         assert hasattr(catalog, "catalog")
 
+    def test_catalog_is_shared(self):
+        assert Catalog().catalog is Catalog().catalog
+        assert Catalog(raster_driver=False).catalog is not Catalog().catalog
+
     def test_get_driver(self):
         catalog = Catalog()
         driver = catalog.get_driver("memory")
@@ -109,3 +120,23 @@ def test_gdal_constant_to_color_name():
     assert gdal_constant_to_color_name(5) == "blue"
     with pytest.raises(ValueError):
         gdal_constant_to_color_name(17)
+
+
+def test_create_time_conversion_func():
+    func = create_time_conversion_func("hours since 1970-01-01")
+    assert func(25) == dt.datetime(1970, 1, 2, 1)
+    with pytest.raises(ValueError):
+        create_time_conversion_func("weeks since 1970-01-01")
+
+
+def test_epsg_to_wkt():
+    wkt = epsg_to_wkt(4326)
+    assert wkt.startswith('GEOGCS["WGS 84"')
+    assert epsg_to_wkt(4326) is wkt
+
+
+def test_wkt_to_sr():
+    wkt = epsg_to_wkt(4326)
+    sr = wkt_to_sr(wkt)
+    assert sr.GetAuthorityCode(None) == "4326"
+    assert wkt_to_sr(wkt) is sr